@@ -2,230 +2,654 @@
 
 import os
 import re
-import json
+import sys
+import mmap
+import functools
+import hashlib
+import statistics
+import logging
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 import fitz  # PyMuPDF
-import pytesseract
-import pdfplumber
-import camelot
-import tabula
-from pdf2image import convert_from_path
-from typing import Dict, Any, List
+import orjson
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Iterable, Callable
 from pypdf import PdfReader
 from pypdf.errors import PdfReadError
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+log = logging.getLogger("pdf_extractor")
+
+# Worker pools must not fork: the table thread may hold locks while they start
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Fast first pass (LSTM only, 200 DPI); pages that come back empty are retried
+OCR_CONFIG = '--oem 1 --psm 6'
+# Default engine mode: uses whatever models are installed (tessdata_fast/best ship no legacy data)
+OCR_RETRY_CONFIG = '--psm 6'
+OCR_BINARIZE_THRESHOLD = 155
+MUPDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+# Below this many pages, starting spawned/forkserver workers (each re-importing this
+# module and reopening the PDF) costs more than extracting the pages serially
+MUPDF_MIN_PARALLEL_PAGES = 32
+# Lines at least this much larger than the median font size are headers
+HEADER_SIZE_RATIO = 1.2
+OCR_DPI = 200
+OCR_RETRY_DPI = 300
+# Default best-effort page render cache. Renders are stored losslessly (PNG) so OCR
+# output is the same with or without it. Nothing evicts entries, so it grows with
+# every distinct PDF OCR'd; delete the directory to reclaim space, or pass
+# cache_dir=None / --no-cache to turn it off.
+RENDER_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pdf_extractor"
+)
+
+# Header detection patterns, unioned so each line is scanned once
+_HEADER_RE = re.compile(
+    r'(?:^\s*[A-Z][A-Z\s]+:?\s*$)'
+    r'|(?:^\s*\d+\.\s+[A-Z][a-zA-Z\s]+)'
+    r'|(?:^\s*§\s*\d+\.\s.*)'
+    r'|(?:^\s*[IVX]+\.\s.*)'
+)
+
+
+def _has_content(text: str) -> bool:
+    """True if text has any non-whitespace character, without allocating a stripped copy"""
+    return bool(text) and not text.isspace()
+
+
+def _load_tesseract():
+    """Import pytesseract on first use (also in pool workers) and configure it"""
+    import pytesseract
+    # Configure Tesseract path if needed
+    if os.name == 'nt':  # Windows
+        pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+    return pytesseract
+
+
+# Per-process PDFium document in OCR pool workers, opened on the first cache miss
+_worker_pdf_path = None
+_worker_pdf = None
+
+
+def _init_ocr_worker(path: str) -> None:
+    """Set up an OCR pool worker for one document"""
+    global _worker_pdf_path
+    # Pin each Tesseract to one OpenMP thread; the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _worker_pdf_path = path
+
+
+def _render_page(page_num: int, dpi: int, cache_path: Optional[str]) -> "Image.Image":
+    """Rasterize one page with PDFium, reusing a render cached on disk by an earlier run"""
+    global _worker_pdf
+    if cache_path is not None and os.path.exists(cache_path):
+        from PIL import Image
+        return Image.open(cache_path)
+    if _worker_pdf is None:
+        import pypdfium2 as pdfium
+        # PDFium isn't thread-safe, so every worker process opens its own document
+        _worker_pdf = pdfium.PdfDocument(_worker_pdf_path)
+    img = _worker_pdf[page_num].render(scale=dpi / 72).to_pil()
+    if cache_path is None:
+        return img
+    # A read-only or full cache must never fail OCR itself. The failure is dropped
+    # silently: pool workers don't log (their records would bypass the parent's handlers)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        # Fastest zlib level: these are scratch files, lossless is what matters
+        img.save(tmp_path, format="PNG", compress_level=1)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return img
+
+
+def _ocr_page(page_num: int, cache_path: Optional[str], dpi: int = OCR_DPI,
+              config: str = OCR_CONFIG, binarize: bool = True) -> str:
+    """Render and OCR a single page in a pool worker (module-level so it can be pickled)"""
+    img = _render_page(page_num, dpi, cache_path)
+    if binarize:
+        img = img.convert('L').point(lambda x: 0 if x < OCR_BINARIZE_THRESHOLD else 255, '1')
+    return _load_tesseract().image_to_string(img, config=config)
+
+
+def _mupdf_page_lines(page) -> List[Dict[str, Any]]:
+    """Non-empty text lines of a PyMuPDF page with their largest font size"""
+    lines = []
+    for block in page.get_text("dict", flags=MUPDF_TEXT_FLAGS)["blocks"]:
+        for line in block.get("lines", ()):
+            spans = line["spans"]
+            text = "".join(span["text"] for span in spans)
+            if _has_content(text):
+                lines.append({
+                    "text": text,
+                    "size": round(max(span["size"] for span in spans), 2)
+                })
+    return lines
+
+
+# Per-process document opened by _init_mupdf_worker in PyMuPDF pool workers
+_worker_doc = None
+
+
+def _init_mupdf_worker(path: str) -> None:
+    """Open the document once per pool worker (fitz.Document can't be pickled)"""
+    global _worker_doc
+    _worker_doc = fitz.open(path)
+
+
+def _mupdf_page(page_num: int) -> tuple:
+    """Extract lines for one page in a pool worker"""
+    return page_num, _mupdf_page_lines(_worker_doc[page_num])
+
+
+def _public_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Content entry without the per-line font data only header detection needs"""
+    if "lines" not in entry:
+        return entry
+    return {key: value for key, value in entry.items() if key != "lines"}
+
+
+def parse_page_spec(spec: str) -> List[int]:
+    """Parse a 1-based page spec like '1-50,100' into sorted 0-based indices"""
+    pages = set()
+    try:
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                first, last = (int(p) for p in part.split('-', 1))
+            else:
+                first = last = int(part)
+            if first < 1 or last < first:
+                raise ValueError(part)
+            pages.update(range(first - 1, last))
+    except ValueError:
+        raise ValueError(f"Invalid page specification: {spec!r}") from None
+    if not pages:
+        raise ValueError(f"Invalid page specification: {spec!r}")
+    return sorted(pages)
+
+
+def _df_to_records(df) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to row dicts, resolving column labels once"""
+    cols = [str(c) for c in df.columns]
+    return [dict(zip(cols, row)) for row in df.itertuples(index=False, name=None)]
+
+
 class AdvancedPDFExtractor:
     """Advanced PDF extraction tool combining multiple parsing strategies"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, pages: Optional[Iterable[int]] = None,
+                 on_page: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cache_dir: Optional[str] = RENDER_CACHE_DIR):
         self.pdf_path = pdf_path
+        # 0-based page indices to extract (None means every page)
+        self.pages = sorted(set(pages)) if pages is not None else None
+        # When set, page entries are handed to the callback as soon as each page is
+        # extracted instead of being kept in results
+        self.on_page = on_page
+        # Root of the OCR render cache (None disables caching)
+        self.cache_dir = cache_dir
+        # File mapping shared by in-process parsers, only held during extract()
+        self._fd = None
+        self._mm = None
+        self.ocr_engine = "Tesseract"
+        self._reset()
+
+    def _reset(self) -> None:
+        """Clear the results of any previous extract() run"""
         self.results = {
             "metadata": {},
             "headers": {},
-            "content": [],
+            # Page number -> entries for that page
+            "content": {},
             "list_items": [],
             "tables": [],
             "figures": []
         }
         self.extraction_methods = []
         self.is_scanned = False
-        self.ocr_engine = "Tesseract"
-        
-        # Configure Tesseract path if needed
-        if os.name == 'nt':  # Windows
-            pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        # 1-based pages already emitted, so a later strategy only fills the gaps
+        self._emitted_pages = set()
+        self._warned_out_of_range = False
+        # Set once every digital strategy failed; tables would be discarded anyway
+        self._tables_cancelled = threading.Event()
+
+    def _open(self) -> None:
+        """Map the file once; in-process parsers read from this shared buffer"""
+        fd = open(self.pdf_path, 'rb')
+        try:
+            self._mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            fd.close()
+            raise
+        self._fd = fd
+
+    @functools.cached_property
+    def _fitz_doc(self) -> fitz.Document:
+        """PyMuPDF document shared by all fitz-based steps, opened on first use"""
+        return fitz.open(self.pdf_path)
+
+    def close(self) -> None:
+        """Release the cached PyMuPDF document and the mapped file"""
+        doc = self.__dict__.pop("_fitz_doc", None)
+        if doc is not None:
+            doc.close()
+        self.__dict__.pop("_render_cache_dir", None)
+        if self._mm is not None:
+            self._mm.close()
+            self._fd.close()
+            self._mm = self._fd = None
+
+    def _page_indices(self, page_count: int) -> List[int]:
+        """0-based indices of the requested pages that exist in the document"""
+        if self.pages is None:
+            return list(range(page_count))
+        indices = [i for i in self.pages if i < page_count]
+        if len(indices) < len(self.pages) and not self._warned_out_of_range:
+            self._warned_out_of_range = True
+            log.warning(
+                "Ignoring %d requested page(s) beyond the document's %d pages",
+                len(self.pages) - len(indices), page_count
+            )
+        return indices
+
+    def _page_count(self) -> int:
+        """Page count from the metadata, or from PDFium if PyMuPDF couldn't open the file"""
+        page_count = self.results["metadata"].get("page_count")
+        if page_count is None:
+            import pypdfium2 as pdfium
+            pdf = pdfium.PdfDocument(self.pdf_path)
+            page_count = len(pdf)
+            pdf.close()
+        return page_count
+
+    def _add_page(self, entry: Dict[str, Any]) -> bool:
+        """Store a page entry, or stream it to the on_page callback; False if already emitted"""
+        if entry["page"] in self._emitted_pages:
+            return False
+        self._emitted_pages.add(entry["page"])
+        if self.on_page is None:
+            self.results["content"].setdefault(entry["page"], []).append(entry)
+        else:
+            self.on_page(entry)
+        return True
+
+    def _iter_content(self) -> Iterable[Dict[str, Any]]:
+        """Content entries in page order"""
+        content = self.results["content"]
+        for page in sorted(content):
+            yield from content[page]
+
+    def serializable_results(self) -> Dict[str, Any]:
+        """Results with content flattened back to a page-ordered list for JSON output"""
+        return {**self.results, "content": [_public_entry(entry) for entry in self._iter_content()]}
 
     def extract(self) -> Dict[str, Any]:
         """Main extraction workflow"""
-        self._extract_metadata()
-        
-        # Attempt extraction methods in priority order
-        methods = [
-            self._extract_with_pymupdf,
-            self._extract_with_pdfplumber,
-            self._extract_with_pypdf,
-            self._ocr_fallback
-        ]
-        
-        for method in methods:
-            if method():
-                break
+        self._reset()
+        self._open()
+        try:
+            self._extract_metadata()
+            
+            # Attempt digital-text methods in priority order
+            methods = [
+                self._extract_with_pymupdf,
+                self._extract_with_pdfplumber,
+                self._extract_with_pypdf
+            ]
+            
+            # Camelot/Tabula only write to results["tables"], so they can run
+            # alongside text extraction without sharing state with it.
+            # The table thread is joined before OCR so it never competes with the OCR pool.
+            with ThreadPoolExecutor(max_workers=1) as tpool:
+                table_future = tpool.submit(self._extract_tables)
+                has_text = any(method() for method in methods)
+                if not has_text:
+                    self._tables_cancelled.set()
+                table_future.result()
+            
+            # Tables only accompany a successful digital-text extraction
+            if not has_text:
+                self.results["tables"].clear()
+                self._ocr_fallback()
+        finally:
+            self.close()
                 
         return self.results
 
     def _extract_metadata(self) -> None:
         """Extract PDF metadata using PyMuPDF"""
-        with fitz.open(self.pdf_path) as doc:
-            metadata = doc.metadata
-            self.results["metadata"] = {
-                "title": metadata.get("title", ""),
-                "author": metadata.get("author", ""),
-                "creator": metadata.get("creator", ""),
-                "creation_date": metadata.get("creation_date", ""),
-                "modification_date": metadata.get("mod_date", ""),
-                "page_count": doc.page_count
-            }
+        try:
+            doc = self._fitz_doc
+        except fitz.FileDataError as e:
+            log.warning("PyMuPDF could not open document: %s", e)
+            return
+        metadata = doc.metadata
+        self.results["metadata"] = {
+            "title": metadata.get("title", ""),
+            "author": metadata.get("author", ""),
+            "creator": metadata.get("creator", ""),
+            "creation_date": metadata.get("creation_date", ""),
+            "modification_date": metadata.get("mod_date", ""),
+            "page_count": doc.page_count
+        }
 
     def _extract_with_pymupdf(self) -> bool:
         """Text extraction using PyMuPDF (fitz)"""
         try:
-            text_content = []
-            with fitz.open(self.pdf_path) as doc:
-                for page_num, page in enumerate(doc):
-                    text = page.get_text("text", flags=fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP)
-                    if text.strip():
-                        text_content.append({
+            doc = self._fitz_doc
+            page_nums = [
+                n for n in self._page_indices(doc.page_count) if n + 1 not in self._emitted_pages
+            ]
+            found = False
+            
+            workers = min(os.cpu_count() or 1, len(page_nums))
+            with contextlib.ExitStack() as stack:
+                if len(page_nums) <= MUPDF_MIN_PARALLEL_PAGES or workers <= 1:
+                    pages = ((page_num, _mupdf_page_lines(doc[page_num])) for page_num in page_nums)
+                else:
+                    # fitz.Document can't be pickled, so each worker opens its own copy;
+                    # imap hands pages back in order as soon as they are done
+                    pool = stack.enter_context(_MP_CONTEXT.Pool(
+                        workers, initializer=_init_mupdf_worker, initargs=(self.pdf_path,)
+                    ))
+                    chunksize = max(1, len(page_nums) // (workers * 4))
+                    pages = pool.imap(_mupdf_page, page_nums, chunksize=chunksize)
+                
+                for page_num, lines in pages:
+                    if lines:
+                        found |= self._add_page({
                             "page": page_num + 1,
-                            "content": text,
+                            "content": "\n".join(line["text"] for line in lines),
+                            "lines": lines,
                             "type": "text"
                         })
             
-            if text_content:
-                self.results["content"].extend(text_content)
+            if found:
                 self.extraction_methods.append("PyMuPDF")
-                self._extract_tables()
                 return True
             return False
         except Exception as e:
-            print(f"PyMuPDF extraction failed: {e}")
+            log.warning("PyMuPDF extraction failed: %s", e)
             return False
 
     def _extract_with_pdfplumber(self) -> bool:
         """Advanced extraction with PDFPlumber"""
         try:
-            text_content = []
-            with pdfplumber.open(self.pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    text = page.extract_text(layout=True, x_density=3, y_density=3)
-                    if text.strip():
-                        text_content.append({
-                            "page": page_num + 1,
-                            "content": text,
-                            "type": "text"
-                        })
+            import pdfplumber
+            # Repeated images (logos, letterheads) are recorded once with every page they appear on
+            figures_by_key = {}
+            key_by_objid = {}
+            page_numbers = [i + 1 for i in self.pages] if self.pages is not None else None
+            found = False
+            with pdfplumber.open(self._mm, pages=page_numbers) as pdf:
+                for page in pdf.pages:
+                    page_num = page.page_number - 1
+                    if page.page_number not in self._emitted_pages:
+                        text = page.extract_text(layout=True, x_density=3, y_density=3)
+                        if _has_content(text):
+                            found |= self._add_page({
+                                "page": page_num + 1,
+                                "content": text,
+                                "type": "text"
+                            })
                     
                     # Extract figures
                     for image in page.images:
-                        self.results["figures"].append({
+                        stream = image["stream"]
+                        objid = getattr(stream, "objid", None)
+                        key, digest = key_by_objid.get(objid, (None, None)) if objid is not None else (None, None)
+                        if key is None:
+                            raw = stream.get_rawdata()
+                            if raw:
+                                digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+                                key = digest
+                            elif objid is not None:
+                                # No bytes to hash: only the same object counts as a repeat
+                                key = ("objid", objid)
+                            if objid is not None:
+                                key_by_objid[objid] = (key, digest)
+                        
+                        figure = figures_by_key.get(key) if key is not None else None
+                        if figure is not None:
+                            if figure["pages"][-1] != page_num + 1:
+                                figure["pages"].append(page_num + 1)
+                            continue
+                        figure = {
+                            "hash": digest,
                             "page": page_num + 1,
+                            "pages": [page_num + 1],
                             "bbox": image["bbox"],
                             "width": image["width"],
                             "height": image["height"]
-                        })
+                        }
+                        if key is not None:
+                            figures_by_key[key] = figure
+                        self.results["figures"].append(figure)
             
-            if text_content:
-                self.results["content"].extend(text_content)
+            if found:
                 self.extraction_methods.append("PDFPlumber")
-                self._extract_tables()
                 return True
             return False
         except Exception as e:
-            print(f"PDFPlumber extraction failed: {e}")
+            log.warning("PDFPlumber extraction failed: %s", e)
             return False
 
     def _extract_with_pypdf(self) -> bool:
         """Fallback extraction with pypdf"""
         try:
-            text_content = []
-            reader = PdfReader(self.pdf_path)
-            for page_num, page in enumerate(reader.pages):
+            reader = PdfReader(self._mm)
+            found = False
+            for page_num in self._page_indices(len(reader.pages)):
+                if page_num + 1 in self._emitted_pages:
+                    continue
+                page = reader.pages[page_num]
                 text = page.extract_text(extraction_mode="layout", layout_mode_space_vertically=False)
-                if text.strip():
-                    text_content.append({
+                if _has_content(text):
+                    found |= self._add_page({
                         "page": page_num + 1,
                         "content": text,
                         "type": "text"
                     })
             
-            if text_content:
-                self.results["content"].extend(text_content)
+            if found:
                 self.extraction_methods.append("PyPDF")
-                self._extract_tables()
                 return True
             return False
         except PdfReadError as e:
-            print(f"Encrypted PDF detected: {e}")
+            log.warning("Encrypted PDF detected: %s", e)
             return False
         except Exception as e:
-            print(f"PyPDF extraction failed: {e}")
+            log.warning("PyPDF extraction failed: %s", e)
             return False
 
     def _ocr_fallback(self) -> bool:
         """Final OCR fallback using Tesseract"""
+        emitted_before = len(self._emitted_pages)
         try:
-            images = convert_from_path(self.pdf_path, dpi=300)
-            text_content = []
-            
-            for page_num, img in enumerate(images):
-                text = pytesseract.image_to_string(img, config='--psm 6')
-                if text.strip():
-                    text_content.append({
-                        "page": page_num + 1,
-                        "content": text,
-                        "type": "ocr_text"
-                    })
+            page_count = self._page_count()
+            page_nums = [
+                n for n in self._page_indices(page_count) if n + 1 not in self._emitted_pages
+            ]
+            if not page_nums:
+                return False
+            workers = min(os.cpu_count() or 1, len(page_nums))
             
-            if text_content:
-                self.results["content"].extend(text_content)
-                self.extraction_methods.append("Tesseract OCR")
-                self.is_scanned = True
-                return True
-            return False
+            # Pages are independent and rendered inside the workers; results are
+            # handed over in page order as soon as each one is ready
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=_MP_CONTEXT,
+                initializer=_init_ocr_worker, initargs=(self.pdf_path,)
+            ) as executor:
+                try:
+                    # One preallocated slot per page, cleared once that page is emitted
+                    slots = [None] * len(page_nums)
+                    for slot, page_num in enumerate(page_nums):
+                        cache_path = self._render_cache_path(page_num, OCR_DPI)
+                        slots[slot] = executor.submit(_ocr_page, page_num, cache_path)
+                    self._flush_ocr_pages(executor, page_nums, slots)
+                except BaseException:
+                    # Don't wait for queued pages nobody will collect
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
         except Exception as e:
-            print(f"OCR extraction failed: {e}")
-            return False
+            log.warning("OCR extraction failed: %s", e)
+        
+        # Pages already handed over count even if a later step failed
+        if len(self._emitted_pages) > emitted_before:
+            self.extraction_methods.append("Tesseract OCR")
+            self.is_scanned = True
+            return True
+        return False
+
+    def _flush_ocr_pages(self, executor: ProcessPoolExecutor, page_nums: List[int],
+                         slots: List[Optional[Future]]) -> None:
+        """Emit OCR pages in slot order as each finishes, retrying empty or failed ones"""
+        for slot, page_num in enumerate(page_nums):
+            future = slots[slot]
+            # A failed page only costs that page, never the rest of the document
+            try:
+                text = future.result()
+            except Exception as e:
+                log.warning("OCR failed for page %d: %s", page_num + 1, e)
+                text = ""
+            if not _has_content(text):
+                # Escalate to a higher DPI, unbinarized, with the default engine
+                cache_path = self._render_cache_path(page_num, OCR_RETRY_DPI)
+                future = executor.submit(
+                    _ocr_page, page_num, cache_path,
+                    dpi=OCR_RETRY_DPI, config=OCR_RETRY_CONFIG, binarize=False
+                )
+                try:
+                    text = future.result()
+                except Exception as e:
+                    log.warning("OCR retry failed for page %d: %s", page_num + 1, e)
+                    text = ""
+            slots[slot] = None
+            if _has_content(text):
+                self._add_page({
+                    "page": page_num + 1,
+                    "content": text,
+                    "type": "ocr_text"
+                })
+
+    @functools.cached_property
+    def _render_cache_dir(self) -> Optional[str]:
+        """Per-document directory for cached page renders, or None if caching is off"""
+        if self.cache_dir is None:
+            return None
+        # Cache is content-addressed so a changed file never hits stale renders
+        digest = hashlib.sha256(self._mm).hexdigest()[:16]
+        cache_dir = os.path.join(self.cache_dir, digest)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            log.info("Render cache disabled: %s", e)
+            return None
+        return cache_dir
+
+    def _render_cache_path(self, page_num: int, dpi: int) -> Optional[str]:
+        """Cache location of a page rendered at the given DPI (None when caching is off)"""
+        if self._render_cache_dir is None:
+            return None
+        return os.path.join(self._render_cache_dir, f"p{page_num + 1}_{dpi}.png")
 
     def _extract_tables(self) -> None:
         """Multi-method table extraction"""
+        if self._tables_cancelled.is_set():
+            return
         # Try Camelot first
         try:
-            camelot_tables = camelot.read_pdf(self.pdf_path, flavor='lattice', pages='all')
+            import camelot
+            if self.pages is None:
+                pages = 'all'
+            else:
+                pages = ','.join(str(i + 1) for i in self._page_indices(self._page_count()))
+            camelot_tables = camelot.read_pdf(self.pdf_path, flavor='lattice', pages=pages) if pages else []
             for table in camelot_tables:
-                if table.df.empty:
+                df = table.df
+                if df.empty:
                     continue
+                # Null out blank text cells with a vectorized strip instead of a regex replace
+                obj_cols = df.select_dtypes(include='object').columns
+                blank = df[obj_cols].apply(lambda col: col.str.strip() == '')
+                df[obj_cols] = df[obj_cols].mask(blank, None)
                 self.results["tables"].append({
                     "method": "Camelot",
                     "page": table.page,
-                    "data": table.df.replace(r'^\s*$', None, regex=True).to_dict(orient='records')
+                    "data": _df_to_records(df)
                 })
         except Exception as e:
-            print(f"Camelot table extraction failed: {e}")
+            log.warning("Camelot table extraction failed: %s", e)
+
+        # Text extraction fell through to OCR, so the tables would be discarded
+        if self._tables_cancelled.is_set():
+            return
 
-        # Try Tabula as fallback
+        # Try Tabula as fallback, only on pages Camelot found no table on.
+        # A single call keeps it to one JVM launch; tabula-java 1.0.5 reports no page
+        # numbers (not even with output_format="json"), so a table's page is only
+        # known when a single page was scanned.
         try:
-            tabula_tables = tabula.read_pdf(self.pdf_path, pages='all', multiple_tables=True)
-            for i, table in enumerate(tabula_tables):
+            covered_pages = {int(t["page"]) for t in self.results["tables"] if t["method"] == "Camelot"}
+            wanted = {i + 1 for i in self._page_indices(self._page_count())}
+            missing = sorted(wanted - covered_pages)
+            if not missing:
+                return
+            import tabula
+            if self._tables_cancelled.is_set():
+                return
+            page = missing[0] if len(missing) == 1 else None
+            for table in tabula.read_pdf(self.pdf_path, pages=missing, multiple_tables=True):
                 if not table.empty:
                     self.results["tables"].append({
                         "method": "Tabula",
-                        "page": i+1,
-                        "data": table.fillna('').to_dict(orient='records')
+                        "page": page,
+                        "data": _df_to_records(table.fillna(''))
                     })
         except Exception as e:
-            print(f"Tabula table extraction failed: {e}")
+            log.warning("Tabula table extraction failed: %s", e)
 
     def _process_content(self) -> None:
         """Post-process extracted content"""
-        # Header detection patterns
-        header_patterns = [
-            re.compile(r'^\s*(?:[A-Z][A-Z\s]+:?\s*)$'),
-            re.compile(r'^\s*\d+\.\s+[A-Z][a-zA-Z\s]+'),
-            re.compile(r'^\s*§\s*\d+\.\s.*'),
-            re.compile(r'^\s*[IVX]+\.\s.*')
-        ]
-
-        current_header = "Main Content"
-        for item in self.results["content"]:
-            lines = item["content"].split('\n')
-            for line in lines:
+        headers = self.results["headers"]
+        bucket = headers.setdefault("Main Content", [])
+
+        # PyMuPDF pages carry font sizes, so headers are detected numerically
+        sizes = [line["size"] for item in self._iter_content() for line in item.get("lines", ())]
+        header_size = HEADER_SIZE_RATIO * statistics.median(sizes) if sizes else None
+
+        for item in self._iter_content():
+            if "lines" in item:
+                for line in item["lines"]:
+                    text = line["text"].strip()
+                    if line["size"] >= header_size:
+                        bucket = headers.setdefault(text, [])
+                    else:
+                        bucket.append(text)
+                continue
+
+            # Plain-text pages (pdfplumber, pypdf, OCR) fall back to regex matching
+            for line in item["content"].split('\n'):
                 line = line.strip()
-                if any(pattern.match(line) for pattern in header_patterns):
-                    current_header = line
-                    self.results["headers"][current_header] = []
+                if not line:
+                    continue
+                if _HEADER_RE.match(line):
+                    bucket = headers.setdefault(line, [])
                 else:
-                    if current_header in self.results["headers"]:
-                        self.results["headers"][current_header].append(line)
-                    else:
-                        self.results["headers"]["Main Content"] = [line]
+                    bucket.append(line)
 
 def main():
     """Command line interface"""
@@ -238,23 +662,55 @@ def main():
     parser.add_argument('pdf_path', help='Path to input PDF file')
     parser.add_argument('-o', '--output', help='Output JSON file path')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
+    parser.add_argument('-p', '--pages', help='Pages to extract, e.g. "1-50,100" (default: all)')
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help='Write each page as a JSON line as soon as it is extracted')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the on-disk OCR render cache')
     
     args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(levelname)s %(message)s'
+    )
     
     try:
-        extractor = AdvancedPDFExtractor(args.pdf_path)
-        results = extractor.extract()
+        pages = parse_page_spec(args.pages) if args.pages else None
+        cache_dir = None if args.no_cache else RENDER_CACHE_DIR
+        
+        if args.stream:
+            # JSON Lines: one record per page, then a final record with everything else
+            with contextlib.ExitStack() as stack:
+                out = stack.enter_context(open(args.output, 'wb')) if args.output else sys.stdout.buffer
+                
+                def write_page(entry: Dict[str, Any]) -> None:
+                    out.write(orjson.dumps(_public_entry(entry), option=orjson.OPT_APPEND_NEWLINE))
+                    out.flush()
+                
+                extractor = AdvancedPDFExtractor(args.pdf_path, pages=pages, on_page=write_page,
+                                                 cache_dir=cache_dir)
+                results = extractor.extract()
+                document = {key: value for key, value in results.items() if key not in ("content", "headers")}
+                out.write(orjson.dumps({"document": document}, option=orjson.OPT_APPEND_NEWLINE))
+            return
+        
+        extractor = AdvancedPDFExtractor(args.pdf_path, pages=pages, cache_dir=cache_dir)
+        extractor.extract()
         extractor._process_content()
+        results = extractor.serializable_results()
         
+        # orjson emits UTF-8 bytes directly; only pretty-print for humans.
+        # Table records can have non-str keys (Camelot's integer column labels).
+        dump_options = orjson.OPT_NON_STR_KEYS
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            with open(args.output, 'wb') as f:
+                f.write(orjson.dumps(results, option=dump_options | (orjson.OPT_INDENT_2 if args.verbose else 0)))
             print(f"Results saved to {args.output}")
         else:
-            print(json.dumps(results, indent=2, ensure_ascii=False))
+            sys.stdout.buffer.write(orjson.dumps(results, option=dump_options | orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
             
     except Exception as e:
-        print(f"Error processing PDF: {str(e)}")
+        log.error("Error processing PDF: %s", e)
         exit(1)
 
 if __name__ == "__main__":